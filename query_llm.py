@@ -1,26 +1,45 @@
 import sys
 from pathlib import Path
-from google import genai
-import dotenv
 import re
 
-dotenv.load_dotenv()
+GEMINI_MODEL = "gemini-2.5-flash-preview-04-17"
 
-gemini_api_key = dotenv.get_key(".env", "GEMINI_API_KEY")
 
-def query_llm(transcription_text_path:Path):
+def extract_response_text(response):
+    """generate_content のレスポンスからテキストを取り出す（取得できなければ None）"""
+    if hasattr(response, 'text'):
+        return response.text
+    elif hasattr(response, 'candidates') and response.candidates:
+        return response.candidates[0].content.parts[0].text
+    return None
+
+def create_client():
+    """.env の GEMINI_API_KEY から genai.Client を作成する（失敗した場合は None）"""
+    # SDK と .env はクライアントを作るときに初めて読み込む
+    import dotenv
+    from google import genai
+
+    dotenv.load_dotenv()
+    gemini_api_key = dotenv.get_key(".env", "GEMINI_API_KEY")
+
     # APIキーの存在チェック
     if not gemini_api_key:
         print("エラー: 環境変数ファイル (.env) に GEMINI_API_KEY が設定されていません。", file=sys.stderr)
         return None
-        
+
     try:
-        client = genai.Client(api_key=gemini_api_key)
+        return genai.Client(api_key=gemini_api_key)
     except Exception as e:
         print(f"エラー: genai.Client の初期化に失敗しました: {e}", file=sys.stderr)
         return None
 
-    model = "gemini-2.5-flash-preview-04-17"
+
+def query_llm(transcription_text_path:Path):
+    client = create_client()
+    if client is None:
+        return None
+
+    model = GEMINI_MODEL
     
     try:
         # テキストファイルの内容をアップロードする
@@ -61,13 +80,10 @@ def query_llm(transcription_text_path:Path):
         print(f"レスポンスの内容: {response}")  # デバッグ用
         
         # レスポンスからテキストを取得
-        if hasattr(response, 'text'):
-            return response.text
-        elif hasattr(response, 'candidates') and response.candidates:
-            return response.candidates[0].content.parts[0].text
-        else:
+        text = extract_response_text(response)
+        if text is None:
             print("エラー: レスポンスからテキストを取得できませんでした。", file=sys.stderr)
-            return None
+        return text
     except Exception as e:
         print(f"エラー: サマリー生成中に予期せぬエラーが発生しました: {e}", file=sys.stderr)
         # GoogleAPIErrorもここで捕捉される
@@ -0,0 +1,249 @@
+import sys
+import re
+import json
+import hashlib
+import argparse
+import datetime
+from pathlib import Path
+from collections import defaultdict
+
+from query_llm import GEMINI_MODEL, create_client, extract_response_text
+
+# 日次サマリー (compose_summary の出力) のファイル名: YYYYMMDD_summary.md
+DAILY_SUMMARY_PATTERN = re.compile(r'^(\d{8})_summary\.md$')
+
+# 週次・月次サマリーのファイル名: YYYY-Www_weekly_summary.md / YYYYMM_monthly_summary.md
+ROLLUP_SUMMARY_PATTERNS = {
+    "weekly": re.compile(r'^(\d{4}-W\d{2})_weekly_summary\.md$'),
+    "monthly": re.compile(r'^(\d{6})_monthly_summary\.md$'),
+}
+
+# 各期間のサマリーを生成したときの日次サマリーのハッシュを保存するファイル
+ROLLUP_STATE_FILENAME = ".rollup_state.json"
+
+
+def find_daily_summaries(summary_dir: Path):
+    """サマリーディレクトリ内の日次サマリーを {日付: パス} の形で返す"""
+    daily_summaries = {}
+    for path in sorted(summary_dir.glob("*_summary.md")):
+        match = DAILY_SUMMARY_PATTERN.match(path.name)
+        if not match:
+            continue
+        try:
+            date = datetime.datetime.strptime(match.group(1), "%Y%m%d").date()
+        except ValueError:
+            print(f"警告: 日付として解釈できないファイル名をスキップします: {path.name}", file=sys.stderr)
+            continue
+        daily_summaries[date] = path
+    return daily_summaries
+
+
+def extract_section(markdown_text: str, heading: str):
+    """`## heading` の見出しから次の同レベル以上の見出しまでの本文を取り出す"""
+    lines = markdown_text.splitlines()
+    section_lines = []
+    in_section = False
+    for line in lines:
+        heading_match = re.match(r'^(#{1,2})(?!#)\s*(.+?)\s*$', line)
+        if heading_match:
+            if in_section:
+                break
+            if heading_match.group(2) == heading:
+                in_section = True
+            continue
+        if in_section:
+            section_lines.append(line)
+    return "\n".join(section_lines).strip()
+
+
+def week_key(date: datetime.date):
+    """ISO週を表すキー（例: 2025-W20）"""
+    iso_year, iso_week, _ = date.isocalendar()
+    return f"{iso_year}-W{iso_week:02d}"
+
+
+def month_key(date: datetime.date):
+    """月を表すキー（例: 202505）"""
+    return date.strftime("%Y%m")
+
+
+def rollup_filename(period: str, key: str):
+    if period == "weekly":
+        return f"{key}_weekly_summary.md"
+    return f"{key}_monthly_summary.md"
+
+
+def find_rollup_summaries(summary_dir: Path, period: str):
+    """既存の週次・月次サマリーを {期間のキー: パス} の形で返す"""
+    rollup_summaries = {}
+    for path in summary_dir.glob(f"*_{period}_summary.md"):
+        match = ROLLUP_SUMMARY_PATTERNS[period].match(path.name)
+        if match:
+            rollup_summaries[match.group(1)] = path
+    return rollup_summaries
+
+
+def file_hash(path: Path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def load_rollup_state(summary_dir: Path):
+    """{"weekly": {キー: {日付: ハッシュ}}, "monthly": {...}} の形の状態を読み込む"""
+    empty_state = {"weekly": {}, "monthly": {}}
+    state_path = summary_dir / ROLLUP_STATE_FILENAME
+    if not state_path.exists():
+        return empty_state
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        return {period: dict(state.get(period, {})) for period in empty_state}
+    except (json.JSONDecodeError, OSError, AttributeError, TypeError, ValueError) as e:
+        print(f"警告: ロールアップの状態ファイルを読み込めませんでした。全期間を再生成します: {e}", file=sys.stderr)
+        return empty_state
+
+
+def save_rollup_state(summary_dir: Path, state: dict):
+    state_path = summary_dir / ROLLUP_STATE_FILENAME
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def build_rollup_prompt(period: str, key: str, dates, daily_summaries: dict):
+    """日次サマリーの「まとめ」と「タスク」を期間ごとにまとめたプロンプトを作る"""
+    period_label = "1週間" if period == "weekly" else "1か月"
+    blocks = []
+    for date in dates:
+        text = daily_summaries[date].read_text(encoding='utf-8')
+        digest = extract_section(text, "まとめ") or text.strip()
+        tasks = extract_section(text, "タスク") or "(なし)"
+        blocks.append(f"### {date.isoformat()}\n#### まとめ\n{digest}\n#### タスク\n{tasks}")
+    daily_text = "\n\n".join(blocks)
+
+    return f"""
+    以下は{period_label}分（{key}）の日報のまとめとタスクです。
+    この期間全体の出来事を簡潔にまとめた後、タスクを整理してもらえませんか？
+    タスクは重複をまとめ、期間内に何度も出てきたものや持ち越されているものを優先してください。
+
+    また、返信のフォーマットはmarkdownで返信してください。
+    返信のフォーマットは以下の通りです。
+
+    ## まとめ
+    (まとめの内容)
+
+    ## タスク
+    (タスクの内容)
+
+    ---
+    {daily_text}
+    """
+
+
+def query_rollup_llm(client, prompt: str):
+    try:
+        print("LLMにロールアップのサマリー生成をリクエスト中...")
+        response = client.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=[prompt]
+        )
+    except Exception as e:
+        print(f"エラー: ロールアップのサマリー生成中に予期せぬエラーが発生しました: {e}", file=sys.stderr)
+        return None
+
+    text = extract_response_text(response)
+    if text is None:
+        print("エラー: レスポンスからテキストを取得できませんでした。", file=sys.stderr)
+    return text
+
+
+def compose_rollups(summary_dir: Path, client=None, force: bool = False):
+    """
+    日次サマリーから週次・月次のサマリーを作成する。
+
+    前回生成したときから日次サマリーが追加・変更・削除された期間のみ再生成する。
+    client には genai.Client と同じ `models.generate_content` を持つオブジェクトを渡せる
+    （省略時は .env の GEMINI_API_KEY から作成）。
+    生成したサマリーのパスのリストを返す。
+    """
+    daily_summaries = find_daily_summaries(summary_dir)
+    previous_state = load_rollup_state(summary_dir)
+    current_hashes = {date: file_hash(path) for date, path in daily_summaries.items()}
+
+    # 期間ごとに含まれる日を集計
+    periods = {"weekly": defaultdict(list), "monthly": defaultdict(list)}
+    for date in sorted(daily_summaries):
+        periods["weekly"][week_key(date)].append(date)
+        periods["monthly"][month_key(date)].append(date)
+
+    next_state = {"weekly": {}, "monthly": {}}
+    pending = []
+    for period, groups in periods.items():
+        # 日次サマリーがすべてなくなった期間のサマリーを削除する
+        for key, rollup_path in sorted(find_rollup_summaries(summary_dir, period).items()):
+            if key not in groups:
+                rollup_path.unlink()
+                print(f"日次サマリーがなくなったため {rollup_path} を削除しました。")
+
+        for key, dates in sorted(groups.items()):
+            period_hashes = {date.strftime("%Y%m%d"): current_hashes[date] for date in dates}
+            rollup_path = summary_dir / rollup_filename(period, key)
+            previous_hashes = previous_state[period].get(key)
+            if not force and rollup_path.exists() and previous_hashes == period_hashes:
+                next_state[period][key] = period_hashes
+                continue
+            pending.append((period, key, dates, period_hashes))
+            # 生成に失敗した場合は前回の状態を残し、次回再生成の対象にする
+            if previous_hashes is not None:
+                next_state[period][key] = previous_hashes
+
+    if not pending:
+        save_rollup_state(summary_dir, next_state)
+        print("更新された日次サマリーはありません。")
+        return []
+
+    if client is None:
+        client = create_client()
+        if client is None:
+            save_rollup_state(summary_dir, next_state)
+            return []
+
+    written_paths = []
+    for period, key, dates, period_hashes in pending:
+        header = "#週報" if period == "weekly" else "#月報"
+        rollup_path = summary_dir / rollup_filename(period, key)
+        prompt = build_rollup_prompt(period, key, dates, daily_summaries)
+        summary = query_rollup_llm(client, prompt)
+        if summary is None:
+            print(f"エラー: {key} のサマリーの生成に失敗しました。", file=sys.stderr)
+            continue
+
+        with open(rollup_path, 'w', encoding='utf-8') as f:
+            f.write(f'{header}\n\n')
+            f.write(summary)
+        next_state[period][key] = period_hashes
+        written_paths.append(rollup_path)
+        print(f"サマリーを {rollup_path} に保存しました。")
+
+    save_rollup_state(summary_dir, next_state)
+    return written_paths
+
+
+if __name__ == "__main__":
+    from dotenv import dotenv_values
+
+    parser = argparse.ArgumentParser(description="日次サマリーから週次・月次のサマリーを作成します。")
+    parser.add_argument("summary_dir", nargs="?", default=dotenv_values(".env").get("SUMMARY_OUTPUT_DIR"),
+                        help="日次サマリーのディレクトリ（省略時は .env の SUMMARY_OUTPUT_DIR）")
+    parser.add_argument("--force", action="store_true",
+                        help="変更の有無にかかわらず全期間を再生成する")
+    args = parser.parse_args()
+
+    if not args.summary_dir:
+        print("エラー: サマリーのディレクトリが指定されていません。", file=sys.stderr)
+        sys.exit(1)
+
+    summary_dir = Path(args.summary_dir).resolve()
+    if not summary_dir.is_dir():
+        print(f"エラー: サマリーのディレクトリが見つかりません: {summary_dir}", file=sys.stderr)
+        sys.exit(1)
+
+    compose_rollups(summary_dir, force=args.force)
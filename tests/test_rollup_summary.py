@@ -0,0 +1,155 @@
+import json
+from types import SimpleNamespace
+
+import rollup_summary
+from rollup_summary import ROLLUP_STATE_FILENAME, compose_rollups, extract_section, file_hash
+
+
+class FakeModels:
+    def __init__(self, fail_keys=()):
+        self.prompts = []
+        self.fail_keys = set(fail_keys)
+
+    def generate_content(self, model, contents):
+        prompt = contents[0]
+        self.prompts.append(prompt)
+        for key in self.fail_keys:
+            if f"（{key}）" in prompt:
+                raise RuntimeError("fake failure")
+        return SimpleNamespace(text="## まとめ\nまとめです\n\n## タスク\n- タスクです\n")
+
+
+class FakeClient:
+    def __init__(self, fail_keys=()):
+        self.models = FakeModels(fail_keys)
+
+
+def write_daily(summary_dir, day, summary="作業をした", tasks="- 続きをやる"):
+    # compose_summary が書き出すのと同じ形式
+    path = summary_dir / f"{day}_summary.md"
+    path.write_text(f"#日報\n\n## まとめ\n{summary}\n\n## タスク\n{tasks}\n", encoding='utf-8')
+    return path
+
+
+def load_state(summary_dir):
+    return json.loads((summary_dir / ROLLUP_STATE_FILENAME).read_text(encoding='utf-8'))
+
+
+def names(paths):
+    return sorted(path.name for path in paths)
+
+
+# 2025-06-30 (月) と 2025-07-01 (火) はどちらも ISO 週 2025-W27
+def setup_week_across_months(tmp_path):
+    write_daily(tmp_path, "20250630")
+    write_daily(tmp_path, "20250701")
+    compose_rollups(tmp_path, client=FakeClient())
+
+
+def test_first_run_writes_week_and_both_months(tmp_path):
+    write_daily(tmp_path, "20250630")
+    write_daily(tmp_path, "20250701")
+    client = FakeClient()
+
+    written = compose_rollups(tmp_path, client=client)
+
+    assert names(written) == [
+        "2025-W27_weekly_summary.md",
+        "202506_monthly_summary.md",
+        "202507_monthly_summary.md",
+    ]
+    assert len(client.models.prompts) == 3
+    weekly_prompt = client.models.prompts[0]
+    assert "2025-06-30" in weekly_prompt and "2025-07-01" in weekly_prompt
+    assert (tmp_path / "2025-W27_weekly_summary.md").read_text(encoding='utf-8').startswith("#週報")
+    assert (tmp_path / "202506_monthly_summary.md").read_text(encoding='utf-8').startswith("#月報")
+
+
+def test_second_run_without_changes_makes_no_llm_calls(tmp_path):
+    setup_week_across_months(tmp_path)
+    client = FakeClient()
+
+    assert compose_rollups(tmp_path, client=client) == []
+    assert client.models.prompts == []
+
+
+def test_edited_day_regenerates_only_its_week_and_month(tmp_path):
+    write_daily(tmp_path, "20250623")
+    setup_week_across_months(tmp_path)
+    write_daily(tmp_path, "20250701", summary="内容を修正した")
+    client = FakeClient()
+
+    written = compose_rollups(tmp_path, client=client)
+
+    assert names(written) == ["2025-W27_weekly_summary.md", "202507_monthly_summary.md"]
+    assert all("内容を修正した" in prompt for prompt in client.models.prompts)
+
+
+def test_failed_generation_is_retried_on_next_run(tmp_path):
+    setup_week_across_months(tmp_path)
+    old_hash = load_state(tmp_path)["weekly"]["2025-W27"]["20250701"]
+    new_hash = file_hash(write_daily(tmp_path, "20250701", summary="内容を修正した"))
+
+    written = compose_rollups(tmp_path, client=FakeClient(fail_keys=["2025-W27"]))
+
+    assert names(written) == ["202507_monthly_summary.md"]
+    state = load_state(tmp_path)
+    assert state["weekly"]["2025-W27"]["20250701"] == old_hash
+    assert state["monthly"]["202507"]["20250701"] == new_hash
+
+    client = FakeClient()
+    written = compose_rollups(tmp_path, client=client)
+
+    # 成功済みの月次サマリーは再生成しない
+    assert names(written) == ["2025-W27_weekly_summary.md"]
+    assert len(client.models.prompts) == 1
+    assert load_state(tmp_path)["weekly"]["2025-W27"]["20250701"] == new_hash
+
+
+def test_deleting_all_days_of_period_removes_rollup(tmp_path):
+    write_daily(tmp_path, "20250707")
+    setup_week_across_months(tmp_path)
+    (tmp_path / "20250630_summary.md").unlink()
+    client = FakeClient()
+
+    written = compose_rollups(tmp_path, client=client)
+
+    assert not (tmp_path / "202506_monthly_summary.md").exists()
+    assert names(written) == ["2025-W27_weekly_summary.md"]
+    assert "202506" not in load_state(tmp_path)["monthly"]
+
+
+def test_force_removes_rollups_without_daily_summaries(tmp_path):
+    setup_week_across_months(tmp_path)
+    (tmp_path / "2025-W20_weekly_summary.md").write_text("#週報\n\n古い\n", encoding='utf-8')
+    (tmp_path / ROLLUP_STATE_FILENAME).unlink()
+
+    compose_rollups(tmp_path, client=FakeClient(), force=True)
+
+    assert not (tmp_path / "2025-W20_weekly_summary.md").exists()
+    assert (tmp_path / "2025-W27_weekly_summary.md").exists()
+
+
+def test_deletion_only_run_does_not_create_client(tmp_path, monkeypatch):
+    setup_week_across_months(tmp_path)
+    (tmp_path / "2025-W20_weekly_summary.md").write_text("#週報\n\n古い\n", encoding='utf-8')
+
+    def fail_create_client():
+        raise AssertionError("create_client should not be called")
+
+    monkeypatch.setattr(rollup_summary, "create_client", fail_create_client)
+
+    assert compose_rollups(tmp_path) == []
+    assert not (tmp_path / "2025-W20_weekly_summary.md").exists()
+
+
+def test_extract_section_reads_compose_summary_layout():
+    text = (
+        "#日報\n\n"
+        "## まとめ\n午前は会議。\n### 詳細\n午後は資料作成。\n\n"
+        "## タスク\n- 資料を送る\n- 見積もりを確認する\n"
+    )
+
+    assert extract_section(text, "まとめ") == "午前は会議。\n### 詳細\n午後は資料作成。"
+    assert extract_section(text, "タスク") == "- 資料を送る\n- 見積もりを確認する"
+    assert extract_section(text, "存在しない") == ""